@@ -10,19 +10,613 @@ License: MIT
 Version: 0.1.0
 """
 import os
+import sys
+import argparse
+import hashlib
 import json
+import queue
+import random
+import re
 import time
-from typing import List, Dict, Any, Optional, Union
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Deque, Dict, Any, Callable, Iterator, Optional, Sequence, Set, Tuple, Union
 from pathlib import Path
 import dotenv
 
 # Load environment variables from .env
 dotenv.load_dotenv()
 
+import requests
 import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from spotipy.cache_handler import CacheFileHandler
+from spotipy.oauth2 import SpotifyOAuth, SpotifyOauthError
 from ytmusicapi import YTMusic
 
+
+def env_int(name: str, default: int) -> int:
+    """
+    Read a positive integer setting from the environment or .env file.
+    
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or invalid
+        
+    Returns:
+        The configured value, or ``default``
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        print(f"Ignoring invalid {name}={value!r}, using {default}.")
+        return default
+    return number
+
+
+# Number of YouTube Music searches run concurrently
+SEARCH_WORKERS = env_int("YTMUSIC_SEARCH_WORKERS", 16)
+
+# Upper bound on YouTube Music requests per second across all workers
+YTMUSIC_MAX_QPS = env_int("YTMUSIC_MAX_QPS", 10)
+
+# Attempts made for a YouTube Music request that keeps failing transiently
+REQUEST_ATTEMPTS = 5
+
+# First and longest delay, in seconds, between retries of a transient error
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+# Longest pause, in seconds, imposed on all workers after a rate limit
+MAX_BACKOFF = 60.0
+
+# File where the Spotify OAuth token is cached between runs
+SPOTIFY_TOKEN_CACHE = ".spotify_token"
+
+# Seconds before expiry at which OAuth tokens are refreshed in the background
+TOKEN_REFRESH_MARGIN = 300
+
+# Redirect URI used when none is configured
+DEFAULT_REDIRECT_URI = "http://localhost:8888/callback"
+
+# Number of Spotify result pages fetched concurrently
+SPOTIFY_PAGE_WORKERS = 5
+
+# Upper bound on Spotify page requests per second
+SPOTIFY_MAX_QPS = 10
+
+# Only the playlist item fields the migration reads, so each 100-track page
+# arrives (and is parsed) without the full album, artist and market metadata
+PLAYLIST_ITEM_FIELDS = (
+    "total,items(is_local,track(name,duration_ms,artists(name),"
+    "album(name),external_ids(isrc)))"
+)
+
+# Keep-alive HTTPS connections pooled per service, enough for every worker
+# (the search workers plus the thread adding songs) even when
+# YTMUSIC_SEARCH_WORKERS is raised; a worker finding the pool full would
+# otherwise open, and then discard, a fresh TLS connection per request
+HTTP_POOL_SIZE = max(32, SEARCH_WORKERS + 1)
+
+# Innertube "params" value ytmusicapi sends for search(filter="songs")
+SONGS_SEARCH_PARAMS = "EgWKAQIIAWoMEA4QChADEAQQCRAF"
+
+# Maximum number of songs added to a YouTube Music playlist per API call
+YTMUSIC_BATCH_SIZE = 50
+
+# File where resolved YouTube Music searches are kept between runs
+SEARCH_CACHE_FILE = ".ytmusic_cache.json"
+
+# Seconds before a cached "not found" result is searched for again
+NEGATIVE_CACHE_TTL = 24 * 60 * 60
+
+# New search results after which the cache is written to disk, so an
+# interrupted run keeps most of the searches it already paid for
+SEARCH_CACHE_FLUSH_EVERY = 200
+
+# Minimum seconds between two redraws of a progress bar (about 10 per second)
+PROGRESS_REFRESH_INTERVAL = 0.1
+
+# Version suffixes dropped from titles for the loosest search queries,
+# e.g. "Song (feat. Someone)" or "Song - Remastered 2011"
+TITLE_SUFFIX = re.compile(r"\s*(?:[(\[][^)\]]*[)\]]|\s-\s.*)$")
+
+# Search fields of a Spotify track: name, primary artist, duration_ms,
+# album name and ISRC
+TrackFields = Tuple[str, str, Optional[int], Optional[str], Optional[str]]
+
+
+def read_json_file(path: Union[str, Path]) -> Any:
+    """
+    Load a JSON file with a single read.
+    
+    Args:
+        path: File to read
+        
+    Returns:
+        The decoded JSON document
+        
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not valid JSON
+    """
+    return json.loads(Path(path).read_bytes())
+
+
+def write_json_file(path: Union[str, Path], data: Any) -> None:
+    """
+    Atomically write a compact JSON document to a file with a single write.
+    
+    The document goes to a temporary file that then replaces ``path``, so
+    readers never see a half-written file.
+    
+    Args:
+        path: File to write
+        data: JSON-serializable document
+        
+    Raises:
+        OSError: If the file cannot be written
+    """
+    tmp_path = Path(f"{path}.tmp")
+    tmp_path.write_text(json.dumps(data, separators=(',', ':')))
+    os.replace(tmp_path, path)
+
+
+def build_http_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Create a requests session tuned for many concurrent API calls.
+    
+    The session keeps up to ``pool_size`` keep-alive connections per host,
+    so concurrent workers reuse TLS connections instead of opening new ones,
+    and retries failed connection attempts with exponential backoff.
+    
+    Throttled or failed responses are returned as they are, never retried
+    here: _call_with_retries is the only layer that retries them, so the
+    rate limiters see every 429 together with its Retry-After header.
+    
+    Args:
+        pool_size: Maximum number of pooled connections per host
+        
+    Returns:
+        Configured requests session
+    """
+    retry = Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.3,
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
+
+
+def parse_selection(selection: str, count: int) -> List[int]:
+    """
+    Parse a playlist selection such as "1-5,7,9-12".
+    
+    Args:
+        selection: Comma-separated 1-based numbers and inclusive ranges
+        count: Number of playlists available
+        
+    Returns:
+        0-based playlist indices in the order given, without duplicates
+        
+    Raises:
+        ValueError: If a token is not a number or range, or is out of bounds
+    """
+    indices: Dict[int, None] = {}
+    for token in selection.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        start, sep, end = token.partition('-')
+        try:
+            first = int(start)
+            last = int(end) if sep else first
+        except ValueError:
+            raise ValueError(f"'{token}' is not a number or a range like 1-5") from None
+        if first > last:
+            raise ValueError(f"range '{token}' is backwards")
+        if first < 1 or last > count:
+            raise ValueError(f"'{token}' is outside 1-{count}")
+        for number in range(first, last + 1):
+            indices[number - 1] = None
+    
+    if not indices:
+        raise ValueError("no playlists selected")
+    return list(indices)
+
+
+def chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """
+    Split a sequence into consecutive slices of at most ``size`` items.
+    
+    Args:
+        items: Sequence to split
+        size: Maximum length of each slice
+        
+    Yields:
+        Consecutive slices of ``items`` in their original order
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def http_status(error: Exception) -> Optional[int]:
+    """
+    Extract the HTTP status code carried by an API client exception.
+    
+    Args:
+        error: Exception raised by spotipy, requests or ytmusicapi
+        
+    Returns:
+        HTTP status code, or None if the error is not tied to a response
+    """
+    # spotipy.SpotifyException
+    status = getattr(error, 'http_status', None)
+    if status is None:
+        # requests.HTTPError
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        # ytmusicapi only reports the status in its message
+        match = re.search(r'\bHTTP (\d{3})\b', str(error))
+        status = int(match.group(1)) if match else None
+    return status
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Extract the server's Retry-After hint from an API client exception.
+    
+    Args:
+        error: Exception raised by spotipy, requests or ytmusicapi
+        
+    Returns:
+        Seconds to wait before retrying, or None if the server gave no hint
+    """
+    # spotipy.SpotifyException carries the headers itself, requests.HTTPError
+    # through its response
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+    try:
+        return float(headers['Retry-After'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Tell whether a failed API call is worth retrying.
+    
+    Args:
+        error: Exception raised by spotipy, requests or ytmusicapi
+        
+    Returns:
+        True for dropped connections, timeouts, rate limits (HTTP 429) and
+        server errors (HTTP 5xx)
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = http_status(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe sliding-window rate limiter that backs off when throttled.
+    
+    While the API is healthy, up to ``rate`` calls are let through in any
+    one-second window. Each time a caller reports a rate-limit response, all
+    callers are paused for an exponentially growing, jittered delay; the
+    delay resets after the next successful call.
+    
+    Attributes:
+        rate (int): Maximum number of calls per second
+        max_backoff (float): Longest pause in seconds after a rate limit
+    """
+    
+    def __init__(self, rate: int, max_backoff: float = MAX_BACKOFF) -> None:
+        """Initialize the limiter for the given number of calls per second."""
+        self.rate = rate
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._calls: Deque[float] = deque()
+        self._backoff = 0.0
+        self._paused_until = 0.0
+    
+    def acquire(self) -> None:
+        """Block until the caller is allowed to issue its request."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 1.0:
+                    self._calls.popleft()
+                
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                else:
+                    delay = 1.0 - (now - self._calls[0])
+            time.sleep(delay)
+    
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """
+        Pause all callers after a rate-limit response.
+        
+        The server's Retry-After hint is used as is when there is one;
+        otherwise the pause doubles with every rate limit in a row.
+        
+        Args:
+            retry_after: Seconds the server asked to wait, if it said so
+        """
+        with self._lock:
+            now = time.monotonic()
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + min(retry_after, self.max_backoff))
+                return
+            if now < self._paused_until:
+                # Another worker already backed off for this burst
+                return
+            self._backoff = min(self.max_backoff, self._backoff * 2 or 1.0)
+            self._paused_until = now + self._backoff * random.uniform(0.5, 1.0)
+    
+    def record_success(self) -> None:
+        """Reset the backoff after a successful call."""
+        with self._lock:
+            self._backoff = 0.0
+
+
+class ProgressBar:
+    """
+    Single-line terminal progress bar for the search stage.
+    
+    The line is redrawn in place with carriage returns, so a playlist of any
+    size produces one line of output instead of one line per track. Redraws
+    are limited to one every PROGRESS_REFRESH_INTERVAL seconds, so fast
+    cache hits do not turn into a terminal write per item. When stdout is
+    not a terminal (output redirected to a file or pipe) only the final
+    counts are written.
+    
+    Attributes:
+        total (int): Number of items to process
+        found (int): Items processed successfully so far
+        missing (int): Items that failed so far
+    """
+    
+    def __init__(self, total: int, desc: str, width: int = 30) -> None:
+        """Initialize an empty bar labelled ``desc`` for ``total`` items."""
+        self.total = total
+        self.found = 0
+        self.missing = 0
+        self._desc = desc
+        self._width = width
+        self._last_draw = 0.0
+        self._interactive = sys.stdout.isatty()
+    
+    def update(self, found: bool) -> None:
+        """
+        Record one processed item and redraw the bar if it is due.
+        
+        Args:
+            found: Whether the item was processed successfully
+        """
+        if found:
+            self.found += 1
+        else:
+            self.missing += 1
+        
+        if not self._interactive:
+            return
+        now = time.monotonic()
+        if now - self._last_draw >= PROGRESS_REFRESH_INTERVAL:
+            self._last_draw = now
+            self._draw()
+    
+    def _draw(self) -> None:
+        """Redraw the progress line with the current counts."""
+        done = self.found + self.missing
+        filled = self._width * done // self.total if self.total else self._width
+        bar = "#" * filled + "-" * (self._width - filled)
+        prefix = "\r" if self._interactive else ""
+        sys.stdout.write(f"{prefix}{self._desc} [{bar}] {done}/{self.total} "
+                         f"(found={self.found}, missing={self.missing})")
+        sys.stdout.flush()
+    
+    def close(self) -> None:
+        """Draw the final counts and finish the progress line."""
+        self._draw()
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+
+class CoalescingSpotifyOAuth(SpotifyOAuth):
+    """
+    SpotifyOAuth variant that shares in-flight token refreshes.
+    
+    When several worker threads notice an expired token at the same time,
+    only the first one calls the Spotify accounts service; the others wait
+    for that pending refresh and reuse its result.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the auth manager with an empty in-flight refresh map."""
+        super().__init__(*args, **kwargs)
+        self._refresh_lock = threading.Lock()
+        self._refresh_inflight: Dict[str, Future] = {}
+    
+    def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Refresh the access token, joining a refresh that is already running.
+        
+        Args:
+            refresh_token: Spotify refresh token of the cached token
+            
+        Returns:
+            The refreshed token information
+            
+        Raises:
+            SpotifyOauthError: If the refresh request fails
+        """
+        with self._refresh_lock:
+            future = self._refresh_inflight.get(refresh_token)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._refresh_inflight[refresh_token] = future
+        
+        if not is_owner:
+            return future.result()
+        
+        try:
+            token_info = super().refresh_access_token(refresh_token)
+            future.set_result(token_info)
+            return token_info
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._refresh_lock:
+                del self._refresh_inflight[refresh_token]
+
+
+class SearchCache:
+    """
+    Persistent cache of YouTube Music search results.
+    
+    Maps a stable hash of a Spotify track to the video ID it resolved to, so
+    re-runs and songs shared between playlists skip the network round-trip.
+    Songs that were not found are cached too, but only for
+    NEGATIVE_CACHE_TTL seconds so they are retried on a later run. The file
+    is rewritten every SEARCH_CACHE_FLUSH_EVERY new results, so a run that
+    is aborted (by a rate limit ban, for instance) can resume from it.
+    
+    Attributes:
+        path (Path): JSON file backing the cache
+    """
+    
+    def __init__(self, path: str = SEARCH_CACHE_FILE) -> None:
+        """Load previously cached results from ``path`` if it exists."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries: Dict[str, List[Any]] = {}
+        self._unsaved = 0
+        if self.path.exists():
+            try:
+                self._entries = read_json_file(self.path)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable search cache {self.path}: {e}")
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Fold case and whitespace so trivially different spellings share a key."""
+        return " ".join(text.casefold().split())
+    
+    @staticmethod
+    def query_key(query: str) -> str:
+        """
+        Build the cache key for a single search query.
+        
+        Args:
+            query: Search query sent to YouTube Music
+            
+        Returns:
+            Hex digest identifying the query
+        """
+        return hashlib.sha1(f"query|{SearchCache._normalize(query)}".encode()).hexdigest()
+    
+    @staticmethod
+    def make_key(track_name: str, artist_name: str, duration_ms: Optional[int]) -> str:
+        """
+        Build the cache key for a track.
+        
+        Title and artist are compared case- and whitespace-insensitively and
+        the duration to the second, so the same song released as a single
+        and on an album, which often differ by a few milliseconds, resolves
+        from one cached search.
+        
+        Args:
+            track_name: Song title
+            artist_name: Primary artist name
+            duration_ms: Track length in milliseconds, if known
+            
+        Returns:
+            Hex digest identifying the track
+        """
+        seconds = round(duration_ms / 1000) if duration_ms else None
+        key = f"{SearchCache._normalize(track_name)}|{SearchCache._normalize(artist_name)}|{seconds}"
+        return hashlib.sha1(key.encode()).hexdigest()
+    
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a cached search result.
+        
+        Args:
+            key: Cache key built with make_key
+            
+        Returns:
+            Tuple of (hit, video_id); video_id is None for cached misses
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        video_id, cached_at = entry
+        if video_id is None and time.time() - cached_at > NEGATIVE_CACHE_TTL:
+            return False, None
+        return True, video_id
+    
+    def set(self, key: str, video_id: Optional[str]) -> None:
+        """
+        Store a search result.
+        
+        Args:
+            key: Cache key built with make_key
+            video_id: Resolved YouTube Music video ID, or None if not found
+        """
+        with self._lock:
+            self._entries[key] = [video_id, time.time()]
+            self._unsaved += 1
+            flush = self._unsaved >= SEARCH_CACHE_FLUSH_EVERY
+        if flush:
+            self.save()
+    
+    def save(self) -> None:
+        """Write the cache to disk if it has results that are not saved yet."""
+        # Serialize writers, as workers flushing concurrently would share
+        # the temporary file
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return
+                entries = dict(self._entries)
+                self._unsaved = 0
+            try:
+                write_json_file(self.path, entries)
+            except OSError as e:
+                print(f"Could not save search cache {self.path}: {e}")
+    
+    def clear(self) -> None:
+        """Drop every cached result, both in memory and on disk."""
+        with self._lock:
+            self._entries = {}
+            self._unsaved = 0
+        if self.path.exists():
+            self.path.unlink()
+
+
 class SpotifyToYTMusicMigrator:
     """
     Main class for migrating playlists from Spotify to YouTube Music.
@@ -34,12 +628,23 @@ class SpotifyToYTMusicMigrator:
     Attributes:
         spotify (spotipy.Spotify): Authenticated Spotify client instance
         ytmusic (YTMusic): Authenticated YouTube Music client instance
+        search_cache (SearchCache): Persistent cache of resolved searches
+        failed_searches (List[str]): Songs whose search failed, with the error
+        failed_adds (List[str]): Song batches that could not be added to
+            their playlist, with the error
     """
     
     def __init__(self) -> None:
         """Initialize the migrator with empty client instances."""
         self.spotify: Optional[spotipy.Spotify] = None
         self.ytmusic: Optional[YTMusic] = None
+        self._rate_limiter = AdaptiveRateLimiter(YTMUSIC_MAX_QPS)
+        self._spotify_rate_limiter = AdaptiveRateLimiter(SPOTIFY_MAX_QPS)
+        self._search_executor: Optional[ThreadPoolExecutor] = None
+        self.search_cache = SearchCache()
+        self._spotify_refresh_timer: Optional[threading.Timer] = None
+        self.failed_searches: List[str] = []
+        self.failed_adds: List[str] = []
         
     def setup_spotify(self, client_id: Optional[str] = None, 
                      client_secret: Optional[str] = None, 
@@ -57,35 +662,95 @@ class SpotifyToYTMusicMigrator:
         """
         print("Setting up connection with Spotify...")
         
-        # Use credentials from .env if not provided
-        client_id = client_id or os.getenv("SPOTIFY_CLIENT_ID")
-        client_secret = client_secret or os.getenv("SPOTIFY_CLIENT_SECRET")
-        redirect_uri = redirect_uri or os.getenv("SPOTIFY_REDIRECT_URI", "http://localhost:8888/callback")
+        credentials = self._load_credentials(
+            spotify_client_id=client_id,
+            spotify_client_secret=client_secret,
+            spotify_redirect_uri=redirect_uri
+        )
         
-        # Verify that we have the necessary credentials
-        if not client_id or not client_secret:
+        # Prompt only for what is still missing
+        if not credentials['spotify_client_id'] or not credentials['spotify_client_secret']:
             print("No Spotify credentials found. Please provide them manually.")
-            client_id = client_id or input("\nEnter your Spotify Client ID: ")
-            client_secret = client_secret or input("Enter your Spotify Client Secret: ")
-            redirect_uri = redirect_uri or input("Enter your Redirect URI (default: http://localhost:8888/callback): ") or "http://localhost:8888/callback"
+            if not credentials['spotify_client_id']:
+                credentials['spotify_client_id'] = input("\nEnter your Spotify Client ID: ")
+            if not credentials['spotify_client_secret']:
+                credentials['spotify_client_secret'] = input("Enter your Spotify Client Secret: ")
+            if not credentials['spotify_redirect_uri']:
+                credentials['spotify_redirect_uri'] = input(
+                    f"Enter your Redirect URI (default: {DEFAULT_REDIRECT_URI}): "
+                ) or DEFAULT_REDIRECT_URI
             
             # Ask if user wants to save the credentials
             if input("\nDo you want to save these credentials for future use? (y/n): ").lower() == 'y':
-                self.save_credentials_to_env(
-                    spotify_client_id=client_id,
-                    spotify_client_secret=client_secret,
-                    spotify_redirect_uri=redirect_uri
-                )
+                self.save_credentials_to_env(**credentials)
+        
+        client_id = credentials['spotify_client_id']
+        client_secret = credentials['spotify_client_secret']
+        redirect_uri = credentials['spotify_redirect_uri'] or DEFAULT_REDIRECT_URI
         
         scope = "user-library-read playlist-read-private"
         
-        self.spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
+        auth_manager = CoalescingSpotifyOAuth(
             client_id=client_id,
             client_secret=client_secret,
             redirect_uri=redirect_uri,
-            scope=scope
-        ))
+            scope=scope,
+            cache_handler=CacheFileHandler(cache_path=SPOTIFY_TOKEN_CACHE)
+        )
+        self.spotify = spotipy.Spotify(auth_manager=auth_manager,
+                                       requests_session=build_http_session())
+        
+        # Authenticate now (reusing the cached token when possible) so the
+        # token can be refreshed ahead of time instead of mid-migration
+        auth_manager.get_access_token(as_dict=False)
+        self._schedule_spotify_refresh()
         print("Connection with Spotify established.")
+    
+    @staticmethod
+    def _load_credentials(**provided: Optional[str]) -> Dict[str, Optional[str]]:
+        """
+        Collect the Spotify credentials in one pass.
+        
+        Args:
+            **provided: Credentials passed in directly, which take precedence
+                over the environment (and therefore over .env)
+            
+        Returns:
+            Dictionary with spotify_client_id, spotify_client_secret and
+            spotify_redirect_uri, each None if it is not configured
+        """
+        keys = ('spotify_client_id', 'spotify_client_secret', 'spotify_redirect_uri')
+        return {key: provided.get(key) or os.getenv(key.upper()) for key in keys}
+    
+    def _schedule_spotify_refresh(self) -> None:
+        """
+        Refresh the Spotify token in the background shortly before it expires.
+        
+        A daemon timer fires TOKEN_REFRESH_MARGIN seconds before the cached
+        token expires, so API calls never have to wait for a refresh.
+        """
+        token = self.spotify.auth_manager.cache_handler.get_cached_token()
+        if not token or not token.get('refresh_token'):
+            return
+        
+        delay = max(0, token['expires_at'] - time.time() - TOKEN_REFRESH_MARGIN)
+        self._spotify_refresh_timer = threading.Timer(delay, self._refresh_spotify_token)
+        self._spotify_refresh_timer.daemon = True
+        self._spotify_refresh_timer.start()
+    
+    def _refresh_spotify_token(self) -> None:
+        """Refresh the cached Spotify token and schedule the next refresh."""
+        auth_manager = self.spotify.auth_manager
+        token = auth_manager.cache_handler.get_cached_token()
+        if not token or 'refresh_token' not in token:
+            return
+        try:
+            auth_manager.refresh_access_token(token['refresh_token'])
+        except (SpotifyOauthError, requests.RequestException) as e:
+            # spotipy still refreshes the token on demand if it expires
+            print(f"\nCould not refresh the Spotify token: {e}")
+            return
+        self._schedule_spotify_refresh()
         
     def setup_ytmusic(self) -> None:
         """
@@ -101,6 +766,9 @@ class SpotifyToYTMusicMigrator:
         """
         print("\nSetting up connection with YouTube Music...")
         
+        # Every client shares one pooled session, whichever file is used
+        session = build_http_session()
+        
         # Check if oauth.json file exists
         oauth_file = "oauth.json"
         if os.path.exists(oauth_file):
@@ -109,23 +777,26 @@ class SpotifyToYTMusicMigrator:
                 print("Found oauth.json file, verifying format...")
                 
                 # Read file to verify its format
-                with open(oauth_file, 'r') as f:
-                    oauth_data = json.load(f)
+                oauth_data = read_json_file(oauth_file)
                 
                 # Check if it's an OAuth2 file with tokens
                 if 'access_token' in oauth_data and 'refresh_token' in oauth_data:
                     print("Detected OAuth2 format with tokens.")
                     
-                    # Create a file in a format compatible with ytmusicapi
-                    headers_file = "ytmusic_headers.json"
-                    self.create_ytmusic_headers_from_oauth(oauth_data, headers_file)
+                    expires_at = oauth_data.get('expires_at')
+                    if expires_at and time.time() > expires_at - TOKEN_REFRESH_MARGIN:
+                        print("⚠️  The token in oauth.json has expired or is about to expire.")
+                        print("Run 'ytmusicapi oauth' again if YouTube Music requests fail.")
                     
-                    # Use the created file
-                    self.ytmusic = YTMusic(headers_file)
+                    # Build the headers in memory and hand them straight to
+                    # ytmusicapi, so no headers file from an earlier run (or
+                    # another account) can go stale next to oauth.json
+                    headers = self.create_ytmusic_headers_from_oauth(oauth_data)
+                    self.ytmusic = YTMusic(headers, requests_session=session)
                     print(f"✅ Connection established using credentials from {oauth_file}")
                 else:
-                    # If it doesn't have tokens, try to use it directly
-                    self.ytmusic = YTMusic(oauth_file)
+                    # If it doesn't have tokens, use the parsed file directly
+                    self.ytmusic = YTMusic(oauth_data, requests_session=session)
                     print(f"✅ Connection established using {oauth_file}")
                 return
             except Exception as e:
@@ -137,7 +808,7 @@ class SpotifyToYTMusicMigrator:
         for file in auth_files:
             if os.path.exists(file):
                 try:
-                    self.ytmusic = YTMusic(file)
+                    self.ytmusic = YTMusic(file, requests_session=session)
                     print(f"✅ Connection established using the file {file}")
                     return
                 except Exception as e:
@@ -147,14 +818,15 @@ class SpotifyToYTMusicMigrator:
         print("Make sure you have a valid oauth.json file in the same folder as this script.")
         raise ValueError("Could not establish connection with YouTube Music.")
     
-    def create_ytmusic_headers_from_oauth(self, oauth_data: Dict[str, Any], 
-                                         output_file: str) -> None:
+    def create_ytmusic_headers_from_oauth(self, oauth_data: Dict[str, Any]) -> Dict[str, str]:
         """
-        Create a headers file compatible with ytmusicapi from OAuth2 data.
+        Create headers compatible with ytmusicapi from OAuth2 data.
         
         Args:
             oauth_data: Dictionary containing OAuth2 tokens and metadata
-            output_file: Path where the headers file should be created
+            
+        Returns:
+            Dictionary of HTTP headers accepted by YTMusic
         """
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36",
@@ -166,10 +838,7 @@ class SpotifyToYTMusicMigrator:
             "Authorization": f"{oauth_data['token_type']} {oauth_data['access_token']}"
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(headers, f, indent=2)
-        
-        print(f"Created {output_file} file from OAuth2 tokens")
+        return headers
     
     def save_credentials_to_env(self, **credentials: str) -> None:
         """
@@ -179,33 +848,94 @@ class SpotifyToYTMusicMigrator:
             **credentials: Key-value pairs of credentials to save
         """
         env_path = Path('.env')
+        env_content = env_path.read_text() if env_path.exists() else ""
         
-        # Read the existing .env file if it exists
-        env_content = ""
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                env_content = f.read()
-        
-        # Update existing variables or add new ones
+        # Update existing variables in place or append new ones, rewriting
+        # the file once. The pattern is anchored to the whole key at the
+        # start of a line, so SPOTIFY_CLIENT_ID never clobbers
+        # SPOTIFY_CLIENT_ID_ALT or matches inside a value or comment
         for key, value in credentials.items():
             key = key.upper()
-            if f"{key}=" in env_content:
-                # Replace the existing variable
-                lines = env_content.split('\n')
-                for i, line in enumerate(lines):
-                    if line.startswith(f"{key}="):
-                        lines[i] = f"{key}={value}"
-                env_content = '\n'.join(lines)
-            else:
-                # Add new variable
-                env_content += f"\n{key}={value}"
+            pattern = re.compile(rf'^{re.escape(key)}=.*$', re.MULTILINE)
+            env_content, replaced = pattern.subn(lambda _: f"{key}={value}", env_content)
+            if not replaced:
+                if env_content and not env_content.endswith('\n'):
+                    env_content += '\n'
+                env_content += f"{key}={value}\n"
         
-        # Save the .env file
-        with open(env_path, 'w') as f:
-            f.write(env_content.strip())
+        env_path.write_text(env_content)
         
         print(f"Credentials saved in the .env file")
     
+    def clear_cache(self) -> None:
+        """Forget every cached YouTube Music search result, in memory and on disk."""
+        self.search_cache.clear()
+    
+    def get_search_executor(self) -> ThreadPoolExecutor:
+        """
+        Return the worker pool used for YouTube Music searches.
+        
+        The pool is created on first use and reused for every playlist of the
+        run, so worker threads and their pooled HTTPS connections stay warm
+        between playlists instead of being rebuilt each time.
+        
+        Returns:
+            Shared thread pool bounded to SEARCH_WORKERS concurrent searches
+        """
+        if self._search_executor is None:
+            self._search_executor = ThreadPoolExecutor(
+                max_workers=SEARCH_WORKERS,
+                thread_name_prefix="ytmusic-search"
+            )
+        return self._search_executor
+    
+    def close(self, cancel_pending: bool = False) -> None:
+        """
+        Stop background work and persist the search cache.
+        
+        Args:
+            cancel_pending: Drop searches that have not started yet instead
+                of running them, for when the migration was aborted
+        """
+        if self._spotify_refresh_timer is not None:
+            self._spotify_refresh_timer.cancel()
+            self._spotify_refresh_timer = None
+        if self._search_executor is not None:
+            self._search_executor.shutdown(wait=True, cancel_futures=cancel_pending)
+            self._search_executor = None
+        self.search_cache.save()
+    
+    def _iter_pages(self, fetch_page: Callable[[int], Dict[str, Any]],
+                    page_size: int) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every item of a paginated Spotify endpoint.
+        
+        The first page is requested on its own to learn the total number of
+        items; the remaining pages are then requested concurrently at their
+        known offsets instead of following the 'next' links one by one.
+        Items are yielded as soon as their page is available, so callers can
+        start working on the first pages while later ones are still loading.
+        
+        Args:
+            fetch_page: Function returning the Spotify page at a given offset
+            page_size: Number of items requested per page
+            
+        Yields:
+            All items of the endpoint in their original order
+            
+        Raises:
+            spotipy.SpotifyException: If any page request still fails after
+                its retries
+        """
+        first_page = fetch_page(0)
+        yield from first_page['items']
+        
+        offsets = range(page_size, first_page['total'], page_size)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=SPOTIFY_PAGE_WORKERS) as executor:
+                for page in executor.map(fetch_page, offsets):
+                    yield from page['items']
+    
     def get_spotify_playlists(self) -> List[Dict[str, Any]]:
         """
         Get all user playlists from Spotify.
@@ -219,44 +949,93 @@ class SpotifyToYTMusicMigrator:
         """
         print("\nGetting your Spotify playlists...")
         
-        results = self.spotify.current_user_playlists()
-        playlists = results['items']
-        
-        while results['next']:
-            results = self.spotify.next(results)
-            playlists.extend(results['items'])
+        playlists = list(self._iter_pages(
+            lambda offset: self._spotify_request(
+                self.spotify.current_user_playlists, limit=50, offset=offset),
+            page_size=50
+        ))
         
         print(f"Found {len(playlists)} playlists.")
         return playlists
     
-    def get_playlist_tracks(self, playlist_id: str) -> List[Dict[str, Any]]:
+    def iter_playlist_tracks(self, playlist_id: str) -> Iterator[Dict[str, Any]]:
         """
-        Get all songs from a Spotify playlist.
+        Stream all songs from a Spotify playlist.
+        
+        Only the fields in PLAYLIST_ITEM_FIELDS are requested, and at most a
+        few pages are held in memory at once however long the playlist is.
         
         Args:
             playlist_id: Spotify playlist ID
             
-        Returns:
-            List of track dictionaries containing song metadata
+        Yields:
+            Track dictionaries containing song metadata, in playlist order
             
         Raises:
             spotipy.SpotifyException: If playlist doesn't exist or API call fails
         """
-        results = self.spotify.playlist_items(playlist_id)
-        tracks = results['items']
-        
-        while results['next']:
-            results = self.spotify.next(results)
-            tracks.extend(results['items'])
+        yield from self._iter_pages(
+            lambda offset: self._spotify_request(
+                self.spotify.playlist_items, playlist_id,
+                fields=PLAYLIST_ITEM_FIELDS, limit=100, offset=offset),
+            page_size=100
+        )
+    
+    @staticmethod
+    def _build_queries(track_name: str, artist_name: str, album_name: Optional[str],
+                       isrc: Optional[str]) -> List[str]:
+        """
+        Build the search queries for a track, from most to least specific.
         
-        return tracks
+        Args:
+            track_name: Song title
+            artist_name: Primary artist name
+            album_name: Album name, if known
+            isrc: International Standard Recording Code, if known
+            
+        Returns:
+            Distinct queries to try in order
+        """
+        # Strip stacked suffixes too, e.g. "Song (feat. X) - Remastered 2011"
+        base_name = track_name
+        while True:
+            stripped = TITLE_SUFFIX.sub("", base_name)
+            if not stripped or stripped == base_name:
+                break
+            base_name = stripped
+        candidates = [
+            isrc,
+            f"{track_name} {artist_name} {album_name}" if album_name else None,
+            f"{track_name} {artist_name}",
+            f"{base_name} {artist_name}",
+            base_name,
+        ]
+        return list(dict.fromkeys(query for query in candidates if query))
     
-    def search_on_ytmusic(self, track: Dict[str, Any]) -> Optional[str]:
+    def search_on_ytmusic(self, track_name: str, artist_name: str,
+                          duration_ms: Optional[int] = None,
+                          album_name: Optional[str] = None,
+                          isrc: Optional[str] = None) -> Optional[str]:
         """
         Search for a Spotify song on YouTube Music and return the video ID.
         
+        Progressively looser queries are tried (ISRC, title with artist and
+        album, title with artist, then the bare title without version
+        suffixes) until one returns a song. Results are looked up in the
+        persistent search cache first, both for the whole track and for each
+        individual query, so a retry never repeats a known miss. A search
+        that fails with an error is not cached, so the song is searched
+        again on the next run. This method is called concurrently from the search worker pool; the
+        shared YTMusic client is only used for independent search requests
+        and every call is throttled by the migrator's rate limiter.
+        
         Args:
-            track: Spotify track dictionary containing name and artist information
+            track_name: Song title
+            artist_name: Primary artist name
+            duration_ms: Track length in milliseconds, used to tell apart
+                different recordings in the cache
+            album_name: Album name, if known
+            isrc: International Standard Recording Code, if known
             
         Returns:
             YouTube Music video ID if found, None otherwise
@@ -264,20 +1043,144 @@ class SpotifyToYTMusicMigrator:
         Raises:
             Exception: If YouTube Music API search fails
         """
-        track_name = track['track']['name']
-        artists = [artist['name'] for artist in track['track']['artists']]
-        artist_name = artists[0]  # Use the first artist for search
+        cache_key = SearchCache.make_key(track_name, artist_name, duration_ms)
+        hit, video_id = self.search_cache.get(cache_key)
+        if hit:
+            return video_id
         
-        query = f"{track_name} {artist_name}"
+        for query in self._build_queries(track_name, artist_name, album_name, isrc):
+            query_key = SearchCache.query_key(query)
+            hit, video_id = self.search_cache.get(query_key)
+            if not hit:
+                video_id = self._search_top_song(query)
+                self.search_cache.set(query_key, video_id)
+            if video_id:
+                break
         
-        try:
-            search_results = self.ytmusic.search(query, filter="songs", limit=1)
-            if search_results:
-                return search_results[0]['videoId']
-            return None
-        except Exception as e:
-            print(f"Error searching for '{query}': {e}")
-            return None
+        self.search_cache.set(cache_key, video_id)
+        return video_id
+    
+    def _call_with_retries(self, limiter: AdaptiveRateLimiter, func: Callable[..., Any],
+                           *args: Any, retry_server_errors: bool = True, **kwargs: Any) -> Any:
+        """
+        Call an API client method under a rate limiter, retrying transient errors.
+        
+        Transient failures are retried up to REQUEST_ATTEMPTS times. A rate
+        limit (HTTP 429) makes all workers of that service back off before
+        the next attempt, for at least as long as the server's Retry-After
+        header asks; dropped connections, timeouts and server errors
+        (HTTP 5xx) are retried by the failing worker alone after an
+        exponential, jittered delay.
+        
+        Args:
+            limiter: Rate limiter of the service being called
+            func: Client method to call
+            *args: Positional arguments for ``func``
+            retry_server_errors: Whether HTTP 5xx responses, dropped
+                connections and timeouts are retried; turn off for requests
+                that may have been applied anyway. Rate limits are always
+                retried, as a throttled request was never processed
+            **kwargs: Keyword arguments for ``func``
+            
+        Returns:
+            Whatever ``func`` returns
+            
+        Raises:
+            Exception: If the call fails with a permanent error, or still
+                fails after the last attempt
+        """
+        for attempt in range(1, REQUEST_ATTEMPTS + 1):
+            limiter.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                status = http_status(e)
+                retryable = is_transient_error(e) and (retry_server_errors or status == 429)
+                if not retryable or attempt == REQUEST_ATTEMPTS:
+                    raise
+                if status == 429:
+                    limiter.penalize(retry_after(e))
+                else:
+                    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                    time.sleep(delay * random.uniform(0.5, 1.0))
+            else:
+                limiter.record_success()
+                return result
+    
+    def _ytmusic_request(self, func: Callable[..., Any], *args: Any,
+                         retry_server_errors: bool = True, **kwargs: Any) -> Any:
+        """
+        Call a YouTube Music client method with rate limiting and retries.
+        
+        Args:
+            func: YTMusic method to call
+            *args: Positional arguments for ``func``
+            retry_server_errors: Whether HTTP 5xx responses, dropped
+                connections and timeouts are retried
+            **kwargs: Keyword arguments for ``func``
+            
+        Returns:
+            Whatever ``func`` returns
+        """
+        return self._call_with_retries(self._rate_limiter, func, *args,
+                                       retry_server_errors=retry_server_errors, **kwargs)
+    
+    def _spotify_request(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a Spotify client method with rate limiting and retries.
+        
+        Args:
+            func: spotipy.Spotify method to call
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+            
+        Returns:
+            Whatever ``func`` returns
+        """
+        return self._call_with_retries(self._spotify_rate_limiter, func, *args, **kwargs)
+    
+    def _search_top_song(self, query: str) -> Optional[str]:
+        """
+        Return the video ID of the top song result for a query.
+        
+        The innertube search request is sent directly and only the first
+        song of the results shelf is read, instead of letting ytmusicapi
+        parse every renderer of the response. A response without a songs
+        shelf means there are no results; only if the response does not have
+        the expected layout is the regular ytmusicapi search used instead.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            YouTube Music video ID of the first song result, None if there is none
+            
+        Raises:
+            Exception: If the YouTube Music API request fails
+        """
+        send_request = getattr(self.ytmusic, '_send_request', None)
+        if send_request is not None:
+            response = self._ytmusic_request(
+                send_request, "search", {"query": query, "params": SONGS_SEARCH_PARAMS}
+            )
+            try:
+                if 'contents' not in response:
+                    return None
+                results = response['contents']
+                if 'tabbedSearchResultsRenderer' in results:
+                    results = results['tabbedSearchResultsRenderer']['tabs'][0]['tabRenderer']['content']
+                sections = results['sectionListRenderer']['contents']
+                shelves = [section['musicShelfRenderer'] for section in sections
+                           if 'musicShelfRenderer' in section]
+                if not shelves or not shelves[0].get('contents'):
+                    return None
+                item = shelves[0]['contents'][0]['musicResponsiveListItemRenderer']
+                return item['playlistItemData']['videoId']
+            except (KeyError, IndexError, TypeError):
+                pass
+        
+        search_results = self._ytmusic_request(self.ytmusic.search, query, filter="songs", limit=1)
+        return search_results[0]['videoId'] if search_results else None
     
     def create_ytmusic_playlist(self, playlist_name: str, description: str) -> Optional[str]:
         """
@@ -294,7 +1197,11 @@ class SpotifyToYTMusicMigrator:
             Exception: If playlist creation fails
         """
         try:
-            playlist_id = self.ytmusic.create_playlist(
+            # A 5xx, dropped connection or timeout may still have created the
+            # playlist, so don't retry those
+            playlist_id = self._ytmusic_request(
+                self.ytmusic.create_playlist,
+                retry_server_errors=False,
                 title=playlist_name,
                 description=description,
                 privacy_status="PRIVATE"  # Create playlists as private by default
@@ -304,99 +1211,317 @@ class SpotifyToYTMusicMigrator:
             print(f"Error creating playlist '{playlist_name}': {e}")
             return None
     
-    def add_tracks_to_playlist(self, playlist_id: str, video_ids: List[str]) -> Optional[Dict[str, Any]]:
+    def add_tracks_to_playlist(self, playlist_id: str, video_ids: List[str]) -> bool:
         """
         Add songs to a YouTube Music playlist.
         
+        Runs on the pipeline's adder thread while searches are still being
+        reported, so failures are not printed here but recorded in
+        failed_adds for the migration summary.
+        
         Args:
             playlist_id: YouTube Music playlist ID
             video_ids: List of YouTube Music video IDs to add
             
         Returns:
-            API response status if successful, None otherwise
-            
-        Raises:
-            Exception: If adding tracks fails
+            True if YouTube Music reported the songs as added, False otherwise
         """
         try:
-            status = self.ytmusic.add_playlist_items(playlist_id, video_ids)
-            return status
+            # duplicates=True keeps songs repeated in the Spotify playlist;
+            # otherwise YouTube Music rejects the whole batch. Because of
+            # it, a replayed add would insert the batch twice, so a 5xx,
+            # dropped connection or timeout (after which the batch may
+            # already be in the playlist) is not retried
+            status = self._ytmusic_request(
+                self.ytmusic.add_playlist_items, playlist_id, video_ids,
+                duplicates=True, retry_server_errors=False
+            )
         except Exception as e:
-            print(f"Error adding songs to playlist: {e}")
-            return None
+            self.failed_adds.append(f"{len(video_ids)} songs to playlist {playlist_id}: {e}")
+            return False
+        
+        # Rejected edits (e.g. STATUS_FAILED for duplicates) come back as a
+        # response rather than an exception
+        if isinstance(status, dict) and 'SUCCEEDED' in status.get('status', ''):
+            return True
+        self.failed_adds.append(f"{len(video_ids)} songs to playlist {playlist_id}: {status}")
+        return False
     
-    def migrate_playlist(self, playlist: Dict[str, Any]) -> Optional[str]:
+    def add_tracks_in_batches(self, playlist_id: str, video_ids: List[str]) -> int:
         """
-        Migrate a complete playlist from Spotify to YouTube Music.
+        Add songs to a YouTube Music playlist in API-sized batches.
         
-        This method handles the entire migration process:
-        1. Creates a new playlist on YouTube Music
-        2. Searches for each song on YouTube Music
-        3. Adds found songs to the new playlist
-        4. Provides progress updates and statistics
+        Args:
+            playlist_id: YouTube Music playlist ID
+            video_ids: Ordered list of YouTube Music video IDs to add
+            
+        Returns:
+            Number of songs that were added successfully
+        """
+        added = 0
+        for batch in chunks(video_ids, YTMUSIC_BATCH_SIZE):
+            if self.add_tracks_to_playlist(playlist_id, list(batch)):
+                added += len(batch)
+        return added
+    
+    def _fetch_and_submit_searches(self, playlist_id: str) -> Tuple[
+            List[str], Dict[str, TrackFields], Dict[Future, str]]:
+        """
+        Stream a Spotify playlist and submit a search for each distinct song.
+        
+        Searches start as soon as their page arrives, so later Spotify pages
+        load while YouTube Music is already being queried. The search fields
+        are extracted once per track. Removed tracks (None) and local files,
+        which only exist on the user's device, are dropped up front; songs
+        repeated in the playlist share one search, keyed like the search
+        cache (title, artist and duration to the second), so the same
+        recording released on several albums is searched only once while
+        different recordings with the same title (a live and a studio take,
+        two "Intro" tracks) are kept apart.
+        Songs already in the search cache get a completed future directly, so
+        only real searches occupy the worker threads.
         
         Args:
-            playlist: Spotify playlist dictionary containing metadata
+            playlist_id: Spotify playlist ID
             
         Returns:
-            YouTube Music playlist ID if successful, None otherwise
+            Tuple of (track_keys, unique_tracks, futures): the song key of
+            every playlist item in order, the search fields of each distinct
+            song, and the pending searches mapped to their song key
             
         Raises:
-            Exception: If migration fails at any step
+            spotipy.SpotifyException: If playlist doesn't exist or API call fails
+        """
+        executor = self.get_search_executor()
+        track_keys = []
+        unique_tracks: Dict[str, TrackFields] = {}
+        futures: Dict[Future, str] = {}
+        for item in self.iter_playlist_tracks(playlist_id):
+            t = item.get('track')
+            if not t or item.get('is_local'):
+                continue
+            name = t['name']
+            artist = t['artists'][0]['name']
+            key = SearchCache.make_key(name, artist, t.get('duration_ms'))
+            track_keys.append(key)
+            if key not in unique_tracks:
+                unique_tracks[key] = fields = (
+                    name, artist, t.get('duration_ms'),
+                    (t.get('album') or {}).get('name'),
+                    (t.get('external_ids') or {}).get('isrc')
+                )
+                # Cached songs are resolved right here instead of costing a
+                # round-trip through the worker pool
+                hit, video_id = self.search_cache.get(key)
+                if hit:
+                    future = Future()
+                    future.set_result(video_id)
+                else:
+                    future = executor.submit(self.search_on_ytmusic, *fields)
+                futures[future] = key
+        return track_keys, unique_tracks, futures
+    
+    def _resolve_playlist(self, playlist: Dict[str, Any], track_keys: List[str],
+                          unique_tracks: Dict[str, TrackFields], futures: Dict[Future, str],
+                          on_batch: Callable[[str, List[str]], None]) -> Optional[str]:
+        """
+        Create the YouTube Music playlist and collect its search results.
+        
+        Found songs are handed to ``on_batch`` in playlist order as soon as
+        YTMUSIC_BATCH_SIZE of them are settled, while the remaining searches
+        are still running; the last, possibly smaller batch follows once
+        every search is done.
+        
+        Args:
+            playlist: Spotify playlist dictionary containing metadata
+            track_keys: Song key of every playlist item, in playlist order
+            unique_tracks: Search fields of each distinct song
+            futures: Pending searches mapped to their song key
+            on_batch: Called with the YouTube Music playlist ID and each
+                ordered batch of video IDs to add
+            
+        Returns:
+            YouTube Music playlist ID, or None if it could not be created
         """
         playlist_name = playlist['name']
-        playlist_id = playlist['id']
-        description = f"Migrated from Spotify"
-        if 'description' in playlist and playlist['description']:
-            description += f": {playlist['description']}"
+        spotify_description = playlist.get('description')
+        description = (f"Migrated from Spotify: {spotify_description}"
+                       if spotify_description else "Migrated from Spotify")
         
         print(f"\nMigrating playlist: {playlist_name}")
+        print(f"  - Found {len(track_keys)} songs on Spotify")
         
-        # Get songs from Spotify playlist
-        tracks = self.get_playlist_tracks(playlist_id)
-        print(f"  - Found {len(tracks)} songs on Spotify")
-        
-        # Create playlist on YouTube Music
+        # Create playlist on YouTube Music while the searches run
         ytmusic_playlist_id = self.create_ytmusic_playlist(playlist_name, description)
         if not ytmusic_playlist_id:
             print(f"  ❌ Could not create playlist on YouTube Music. Skipping.")
+            for future in futures:
+                future.cancel()
             return None
         
-        # Search for each song on YouTube Music
-        video_ids = []
-        not_found = 0
+        # Collect the search results as they complete. A playlist position
+        # is settled once its song and every song before it are resolved;
+        # settled songs are expanded back to playlist order (duplicates
+        # included) and released in batches
+        resolved: Dict[str, Optional[str]] = {}
+        failed: Set[str] = set()
+        pending: List[str] = []
+        next_position = 0
+        found = 0
+        progress = ProgressBar(len(futures), desc="  - Searching")
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                video_id = future.result()
+            except Exception as e:
+                # Reported once, in the migration summary
+                name, artist, *_ = unique_tracks[key]
+                self.failed_searches.append(f"{name} - {artist}: {e}")
+                failed.add(key)
+                video_id = None
+            resolved[key] = video_id
+            progress.update(found=bool(video_id))
+            
+            while next_position < len(track_keys) and track_keys[next_position] in resolved:
+                video_id = resolved[track_keys[next_position]]
+                if video_id:
+                    pending.append(video_id)
+                    found += 1
+                next_position += 1
+            while len(pending) >= YTMUSIC_BATCH_SIZE:
+                on_batch(ytmusic_playlist_id, pending[:YTMUSIC_BATCH_SIZE])
+                del pending[:YTMUSIC_BATCH_SIZE]
+        progress.close()
+        
+        if pending:
+            on_batch(ytmusic_playlist_id, pending)
         
-        for i, track in enumerate(tracks):
-            if not track['track']:  # Some tracks might be None or not have the 'track' key
-                continue
-                
-            print(f"  - Processing [{i+1}/{len(tracks)}]: {track['track']['name']} - {track['track']['artists'][0]['name']}", end="")
+        # Report the songs not found in a single write
+        not_found = [f"  ❌ Not found: {name} - {artist}\n"
+                     for key, (name, artist, *_) in unique_tracks.items()
+                     if not resolved[key] and key not in failed]
+        sys.stdout.write("".join(not_found))
+        if failed:
+            print(f"  ⚠️  {len(failed)} songs could not be searched because of errors (see the summary)")
+        print(f"  - Songs found: {found} out of {len(track_keys)}")
+        
+        return ytmusic_playlist_id
+    
+    def migrate_playlist(self, playlist: Dict[str, Any]) -> Optional[str]:
+        """
+        Migrate a complete playlist from Spotify to YouTube Music.
+        
+        This method handles the entire migration process:
+        1. Streams the songs from Spotify and searches each on YouTube Music
+        2. Creates a new playlist on YouTube Music while the searches run
+        3. Adds found songs to the new playlist as their searches settle
+        4. Provides progress updates and statistics
+        
+        Args:
+            playlist: Spotify playlist dictionary containing metadata
             
-            video_id = self.search_on_ytmusic(track)
-            if video_id:
-                video_ids.append(video_id)
-                print(" ✓")
-            else:
-                not_found += 1
-                print(" ❌")
+        Returns:
+            YouTube Music playlist ID if successful, None otherwise
+            
+        Raises:
+            Exception: If migration fails at any step
+        """
+        result = self._migrate_pipelined([playlist])[0]
+        if result['ytmusic_id']:
+            print(f"  ✅ Playlist migrated: {playlist['name']} ({result['songs_added']} songs added)")
+        return result['ytmusic_id']
+    
+    def _migrate_pipelined(self, playlists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Migrate several playlists with their stages overlapping.
+        
+        Three stages run at the same time, connected by queues:
+        1. A fetcher thread streams each playlist from Spotify and submits
+           its searches, staying one playlist ahead
+        2. The calling thread creates each YouTube Music playlist and
+           collects its search results
+        3. An adder thread adds the found songs to YouTube Music, batch by
+           batch as the searches settle
+        
+        Adding songs and fetching the next playlist therefore never hold up
+        the searches.
+        
+        Args:
+            playlists: Spotify playlist dictionaries to migrate, in order
             
-            # Add songs in batches of 50 (API limit) or at the end
-            if len(video_ids) == 50 or i == len(tracks) - 1:
-                if video_ids:
-                    status = self.add_tracks_to_playlist(ytmusic_playlist_id, video_ids)
-                    if status:
-                        print(f"  - Added {len(video_ids)} songs to YouTube Music")
-                    video_ids = []  # Reset the list for the next batch
+        Returns:
+            List of migration results containing playlist names, IDs and
+            the number of songs added
             
-            # Small pause to avoid overloading the APIs
-            time.sleep(0.5)
+        Raises:
+            Exception: If fetching a playlist from Spotify fails
+        """
+        fetch_queue: queue.Queue = queue.Queue(maxsize=1)
+        add_queue: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        
+        def hand_over(job: Any) -> None:
+            # Give up instead of blocking forever once the consumer has stopped
+            while not stop.is_set():
+                try:
+                    fetch_queue.put(job, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
         
-        print(f"  ✅ Playlist migrated: {playlist_name}")
-        print(f"  - Songs found: {len(tracks) - not_found} out of {len(tracks)}")
+        def fetch_stage() -> None:
+            for playlist in playlists:
+                if stop.is_set():
+                    return
+                try:
+                    hand_over((playlist, self._fetch_and_submit_searches(playlist['id'])))
+                except Exception as e:
+                    hand_over((playlist, e))
+                    return
+            hand_over(None)
         
-        return ytmusic_playlist_id
+        def add_stage() -> None:
+            while True:
+                job = add_queue.get()
+                if job is None:
+                    return
+                ytmusic_playlist_id, video_ids, result = job
+                result['songs_added'] += self.add_tracks_in_batches(ytmusic_playlist_id, video_ids)
+        
+        fetcher = threading.Thread(target=fetch_stage, name="spotify-fetch", daemon=True)
+        adder = threading.Thread(target=add_stage, name="ytmusic-add", daemon=True)
+        fetcher.start()
+        adder.start()
+        
+        results = []
+        try:
+            while True:
+                job = fetch_queue.get()
+                if job is None:
+                    break
+                playlist, prepared = job
+                if isinstance(prepared, Exception):
+                    raise prepared
+                
+                result = {
+                    'spotify_name': playlist['name'],
+                    'ytmusic_id': None,
+                    'songs_added': 0
+                }
+                results.append(result)
+                result['ytmusic_id'] = self._resolve_playlist(
+                    playlist, *prepared,
+                    on_batch=lambda pid, batch, result=result: add_queue.put((pid, batch, result))
+                )
+        finally:
+            # Let queued additions finish even if a later stage failed
+            stop.set()
+            add_queue.put(None)
+            adder.join()
+        
+        return results
     
-    def migrate_all_playlists(self) -> List[Dict[str, Union[str, Optional[str]]]]:
+    def migrate_all_playlists(self) -> List[Dict[str, Any]]:
         """
         Migrate all user playlists with interactive selection.
         
@@ -404,7 +1529,8 @@ class SpotifyToYTMusicMigrator:
         which ones to migrate. Provides detailed progress and summary.
         
         Returns:
-            List of migration results containing playlist names and IDs
+            List of migration results containing playlist names, IDs and
+            the number of songs added
             
         Raises:
             Exception: If playlist retrieval or migration fails
@@ -416,32 +1542,49 @@ class SpotifyToYTMusicMigrator:
         for i, playlist in enumerate(playlists):
             print(f"{i+1}. {playlist['name']} ({playlist['tracks']['total']} songs)")
         
-        # Ask which playlists to migrate
-        selection = input("\nWhich playlists do you want to migrate? (numbers separated by commas, 'all' for all): ")
-        
-        selected_playlists = []
-        if selection.lower() == 'all':
-            selected_playlists = playlists
-        else:
+        # Ask which playlists to migrate until the selection is valid
+        while True:
+            selection = input("\nWhich playlists do you want to migrate? (numbers or ranges separated by commas, e.g. 1-5,7; 'all' for all): ")
+            if selection.strip().lower() == 'all':
+                selected_playlists = playlists
+                break
             try:
-                indices = [int(idx.strip()) - 1 for idx in selection.split(',')]
-                selected_playlists = [playlists[idx] for idx in indices if 0 <= idx < len(playlists)]
-            except:
-                print("Invalid selection. Exiting.")
-                return
+                indices = parse_selection(selection, len(playlists))
+            except ValueError as e:
+                print(f"Invalid selection: {e}")
+                continue
+            selected_playlists = [playlists[idx] for idx in indices]
+            break
         
-        # Migrate the selected playlists
-        results = []
-        for playlist in selected_playlists:
-            ytmusic_playlist_id = self.migrate_playlist(playlist)
-            results.append({
-                'spotify_name': playlist['name'],
-                'ytmusic_id': ytmusic_playlist_id
-            })
+        # Migrate the selected playlists. If the migration is aborted, the
+        # searches already queued (possibly for the next playlist) are
+        # dropped rather than run to completion
+        completed = False
+        try:
+            results = self._migrate_pipelined(selected_playlists)
+            completed = True
+        finally:
+            self.close(cancel_pending=not completed)
         
         # Show summary
         print("\n=== Migration Summary ===")
+        for result in results:
+            if result['ytmusic_id']:
+                print(f"  ✅ {result['spotify_name']}: {result['songs_added']} songs added")
+            else:
+                print(f"  ❌ {result['spotify_name']}: not migrated")
         print(f"Playlists migrated: {len([r for r in results if r['ytmusic_id']])}/{len(selected_playlists)}")
+        if self.failed_searches:
+            print(f"\n{len(self.failed_searches)} songs could not be searched because of errors.")
+            print("They are not cached, so running the migration again retries just these:")
+            for song in self.failed_searches:
+                print(f"  - {song}")
+        if self.failed_adds:
+            print(f"\n{len(self.failed_adds)} batches of songs could not be added:")
+            for failure in self.failed_adds:
+                print(f"  - {failure}")
+            print("After a server error or a dropped connection a batch may have been added")
+            print("anyway, so check those playlists on YouTube Music before migrating them again.")
         
         return results
 
@@ -450,14 +1593,20 @@ def main() -> None:
     Main entry point for the Spotify to YouTube Music migration tool.
     
     This function orchestrates the entire migration process:
-    1. Checks for existing credentials
-    2. Sets up authentication for both services
-    3. Initiates the playlist migration process
-    4. Handles errors and provides user feedback
+    1. Parses command line options
+    2. Checks for existing credentials
+    3. Sets up authentication for both services
+    4. Initiates the playlist migration process
+    5. Handles errors and provides user feedback
     
     Raises:
         Exception: If authentication or migration fails
     """
+    parser = argparse.ArgumentParser(description="Migrate playlists from Spotify to YouTube Music.")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="discard cached YouTube Music search results before migrating")
+    args = parser.parse_args()
+    
     print("=== Spotify to YouTube Music Playlist Migrator ===")
     print("This tool will help you migrate your playlists from Spotify to YouTube Music.")
     
@@ -475,6 +1624,10 @@ def main() -> None:
     
     migrator = SpotifyToYTMusicMigrator()
     
+    if args.clear_cache:
+        migrator.clear_cache()
+        print("\nSearch cache cleared.")
+    
     try:
         # Set up connections
         migrator.setup_spotify()
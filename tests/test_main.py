@@ -0,0 +1,324 @@
+"""
+Tests for the migration logic, run against fake Spotify and YouTube Music clients.
+"""
+
+import threading
+import time
+
+import pytest
+import spotipy
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyOAuth
+
+import main
+from main import (AdaptiveRateLimiter, CoalescingSpotifyOAuth, SearchCache,
+                  SpotifyToYTMusicMigrator, parse_selection)
+
+
+def search_response(video_id=None):
+    """Build an innertube search response with one song, or no results."""
+    sections = []
+    if video_id:
+        item = {'musicResponsiveListItemRenderer': {'playlistItemData': {'videoId': video_id}}}
+        sections.append({'musicShelfRenderer': {'contents': [item]}})
+    else:
+        sections.append({'itemSectionRenderer': {}})
+    tab = {'tabRenderer': {'content': {'sectionListRenderer': {'contents': sections}}}}
+    return {'contents': {'tabbedSearchResultsRenderer': {'tabs': [tab]}}}
+
+
+def playlist_item(name, duration_ms=200000):
+    """Build a Spotify playlist item as returned with PLAYLIST_ITEM_FIELDS."""
+    return {'is_local': False,
+            'track': {'name': name, 'duration_ms': duration_ms,
+                      'artists': [{'name': 'Artist'}], 'album': None, 'external_ids': None}}
+
+
+class FakeSpotify:
+    """Spotify client serving fixed playlists page by page."""
+
+    def __init__(self, playlists):
+        self.playlists = playlists
+
+    def playlist_items(self, playlist_id, fields=None, limit=100, offset=0):
+        items = self.playlists[playlist_id]
+        return {'items': items[offset:offset + limit], 'total': len(items)}
+
+
+class FakeYTMusic:
+    """YouTube Music client that finds every song whose title starts with 'song'."""
+
+    def __init__(self):
+        self.queries = []
+        self.library_searches = 0
+        self.batches = []
+
+    def _send_request(self, endpoint, body):
+        self.queries.append(body['query'])
+        query = body['query']
+        return search_response(f"v-{query.split()[0]}" if query.startswith('song') else None)
+
+    def search(self, query, filter=None, limit=20):
+        self.library_searches += 1
+        return []
+
+    def create_playlist(self, title, description, privacy_status):
+        return 'yt-playlist'
+
+    def add_playlist_items(self, playlist_id, video_ids, duplicates=False):
+        self.batches.append(list(video_ids))
+        if not duplicates and len(set(video_ids)) != len(video_ids):
+            return {'status': 'STATUS_FAILED'}
+        return {'status': 'STATUS_SUCCEEDED'}
+
+
+@pytest.fixture
+def migrator(tmp_path, monkeypatch):
+    """Migrator wired to fake clients, with its cache in a temporary folder."""
+    monkeypatch.chdir(tmp_path)
+    migrator = SpotifyToYTMusicMigrator()
+    migrator.ytmusic = FakeYTMusic()
+    migrator._rate_limiter = AdaptiveRateLimiter(10000)
+    migrator._spotify_rate_limiter = AdaptiveRateLimiter(10000)
+    yield migrator
+    migrator.close()
+
+
+def test_parse_selection_ranges_keep_order_without_duplicates():
+    assert parse_selection("3, 1-2,2", 5) == [2, 0, 1]
+
+
+@pytest.mark.parametrize("selection", ["0", "2-1", "1-6", "a", " , "])
+def test_parse_selection_rejects_invalid_input(selection):
+    with pytest.raises(ValueError):
+        parse_selection(selection, 5)
+
+
+def test_search_cache_expires_misses_only(tmp_path, monkeypatch):
+    cache = SearchCache(tmp_path / "cache.json")
+    cache.set("found", "video")
+    cache.set("missing", None)
+    assert cache.get("missing") == (True, None)
+
+    later = time.time() + main.NEGATIVE_CACHE_TTL + 1
+    monkeypatch.setattr(main.time, "time", lambda: later)
+    assert cache.get("found") == (True, "video")
+    assert cache.get("missing") == (False, None)
+
+
+def test_search_cache_round_trips_through_disk(tmp_path):
+    cache = SearchCache(tmp_path / "cache.json")
+    cache.set("found", "video")
+    cache.save()
+    assert SearchCache(tmp_path / "cache.json").get("found") == (True, "video")
+
+
+def test_build_queries_strips_stacked_suffixes():
+    queries = SpotifyToYTMusicMigrator._build_queries(
+        "Song (feat. X) - Remastered 2011", "Artist", None, None)
+    assert queries[-1] == "Song"
+
+
+def test_missed_song_sends_one_request_per_query(migrator):
+    video_id = migrator.search_on_ytmusic("Unknown (Live)", "Artist", 200000)
+
+    assert video_id is None
+    assert migrator.ytmusic.queries == ["Unknown (Live) Artist", "Unknown Artist", "Unknown"]
+    assert migrator.ytmusic.library_searches == 0
+
+
+def test_batches_keep_playlist_order_including_repeated_songs(migrator):
+    # 70 distinct songs, then 60 repeats of the first ones
+    items = [playlist_item(f"song{i}") for i in range(70)]
+    items += [playlist_item(f"song{i}") for i in range(60)]
+    migrator.spotify = FakeSpotify({'p1': items})
+
+    results = migrator._migrate_pipelined([{'id': 'p1', 'name': 'Playlist'}])
+
+    batches = migrator.ytmusic.batches
+    assert [len(batch) for batch in batches] == [50, 50, 30]
+    assert sum(batches, []) == [f"v-song{i}" for i in range(70)] + [f"v-song{i}" for i in range(60)]
+    assert results[0]['songs_added'] == 130
+    assert not migrator.failed_adds
+
+
+def test_failed_search_is_reported_once_in_the_summary(migrator, capsys):
+    def send_request(endpoint, body):
+        raise ValueError("bad response")
+
+    migrator.ytmusic._send_request = send_request
+    migrator.spotify = FakeSpotify({'p1': [playlist_item("song0")]})
+
+    migrator._migrate_pipelined([{'id': 'p1', 'name': 'Playlist'}])
+
+    assert migrator.failed_searches == ["song0 - Artist: bad response"]
+    output = capsys.readouterr().out
+    assert "Not found" not in output
+    assert "bad response" not in output
+
+
+def test_rejected_batch_is_not_counted(migrator):
+    migrator.ytmusic.add_playlist_items = lambda *args, **kwargs: {'status': 'STATUS_FAILED'}
+
+    assert migrator.add_tracks_in_batches('yt-playlist', ['v1', 'v2']) == 0
+    assert len(migrator.failed_adds) == 1
+
+
+def test_add_is_not_replayed_after_a_server_error(migrator):
+    calls = []
+
+    def add_playlist_items(*args, **kwargs):
+        calls.append(args)
+        raise Exception("Server returned HTTP 500: Internal Server Error")
+
+    migrator.ytmusic.add_playlist_items = add_playlist_items
+
+    assert migrator.add_tracks_in_batches('yt-playlist', ['v1', 'v2']) == 0
+    assert len(calls) == 1
+    assert len(migrator.failed_adds) == 1
+
+
+def test_aborted_close_drops_queued_searches(migrator):
+    release = threading.Event()
+    started = []
+
+    def slow_search():
+        started.append(True)
+        release.wait()
+
+    executor = migrator.get_search_executor()
+    futures = [executor.submit(slow_search) for _ in range(main.SEARCH_WORKERS * 3)]
+    threading.Timer(0.2, release.set).start()
+    migrator.close(cancel_pending=True)
+
+    assert len(started) == main.SEARCH_WORKERS
+    assert sum(future.cancelled() for future in futures) == main.SEARCH_WORKERS * 2
+
+
+def test_concurrent_token_refreshes_share_one_request(monkeypatch):
+    calls = []
+
+    def refresh_access_token(self, refresh_token):
+        calls.append(refresh_token)
+        time.sleep(0.2)
+        return {'access_token': f"token-{len(calls)}"}
+
+    monkeypatch.setattr(SpotifyOAuth, "refresh_access_token", refresh_access_token)
+    auth_manager = CoalescingSpotifyOAuth(
+        client_id="id", client_secret="secret", redirect_uri=main.DEFAULT_REDIRECT_URI,
+        cache_handler=MemoryCacheHandler()
+    )
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(auth_manager.refresh_access_token("refresh")))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["refresh"]
+    assert results == [{'access_token': "token-1"}] * 5
+
+    # Once finished, the next expiry triggers a new refresh
+    assert auth_manager.refresh_access_token("refresh") == {'access_token': "token-2"}
+
+
+@pytest.mark.parametrize("value, expected", [(None, 16), ("", 16), ("8", 8), ("0", 16), ("-2", 16), ("abc", 16)])
+def test_env_int_falls_back_to_the_default(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("TEST_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("TEST_WORKERS", value)
+    assert main.env_int("TEST_WORKERS", 16) == expected
+
+
+class RecordingLimiter(AdaptiveRateLimiter):
+    """Rate limiter that never waits and records every penalty."""
+
+    def __init__(self):
+        super().__init__(10000)
+        self.penalties = []
+
+    def acquire(self):
+        pass
+
+    def penalize(self, retry_after=None):
+        self.penalties.append(retry_after)
+
+
+def rate_limited(retry_after=None):
+    """Build the exception spotipy raises for an HTTP 429."""
+    headers = {'Retry-After': retry_after} if retry_after is not None else {}
+    return spotipy.SpotifyException(429, -1, "rate limited", headers=headers)
+
+
+def test_retry_after_is_read_from_the_error():
+    assert main.retry_after(rate_limited("3")) == 3.0
+    assert main.retry_after(rate_limited()) is None
+    assert main.retry_after(ValueError("no response")) is None
+
+
+def test_rate_limit_backs_off_for_the_servers_retry_after(migrator):
+    limiter = RecordingLimiter()
+    responses = [rate_limited("2"), "ok"]
+
+    def call():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert migrator._call_with_retries(limiter, call) == "ok"
+    assert limiter.penalties == [2.0]
+
+
+def test_retry_after_pause_is_capped_and_does_not_escalate():
+    limiter = AdaptiveRateLimiter(10, max_backoff=0.2)
+    limiter.penalize(retry_after=30)
+    started = time.monotonic()
+    limiter.acquire()
+    assert 0.1 < time.monotonic() - started < 0.5
+    # A hinted pause leaves the exponential backoff untouched
+    assert limiter._backoff == 0.0
+
+
+def test_persistent_spotify_rate_limit_is_retried_by_one_layer_only(migrator):
+    limiter = RecordingLimiter()
+    migrator._spotify_rate_limiter = limiter
+    calls = []
+
+    def playlist_items(*args, **kwargs):
+        calls.append(args)
+        raise rate_limited("1")
+
+    with pytest.raises(spotipy.SpotifyException):
+        migrator._spotify_request(playlist_items, "p1")
+    assert len(calls) == main.REQUEST_ATTEMPTS
+    assert limiter.penalties == [1.0] * (main.REQUEST_ATTEMPTS - 1)
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_http_session_leaves_status_retries_to_the_caller(status):
+    retry = main.build_http_session().get_adapter("https://api.spotify.com").max_retries
+    assert not retry.is_retry("GET", status, has_retry_after=True)
+
+
+def test_save_credentials_updates_whole_keys_only(migrator, tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("# SPOTIFY_CLIENT_ID=commented\n"
+                        "SPOTIFY_CLIENT_ID_ALT=other\n"
+                        "SPOTIFY_CLIENT_ID=old\n"
+                        "OTHER=keep")
+
+    migrator.save_credentials_to_env(spotify_client_id="new\\1id", spotify_client_secret="secret")
+
+    assert env_file.read_text() == ("# SPOTIFY_CLIENT_ID=commented\n"
+                                    "SPOTIFY_CLIENT_ID_ALT=other\n"
+                                    "SPOTIFY_CLIENT_ID=new\\1id\n"
+                                    "OTHER=keep\n"
+                                    "SPOTIFY_CLIENT_SECRET=secret\n")
+
+
+def test_save_credentials_creates_the_env_file(migrator, tmp_path):
+    migrator.save_credentials_to_env(spotify_client_id="id")
+    assert (tmp_path / ".env").read_text() == "SPOTIFY_CLIENT_ID=id\n"